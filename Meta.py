@@ -1,13 +1,148 @@
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
+from matplotlib.collections import PolyCollection
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.backends.backend_pdf import PdfPages
 import seaborn as sns
 from datetime import datetime, timedelta
 import warnings
+import ast
+import asyncio
+import base64
+import html
+import io
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 warnings.filterwarnings('ignore')
 
+# Protège rcParams pendant les contextes de style ouverts par plusieurs threads
+_STYLE_LOCK = threading.RLock()
+
+def _as_float(x):
+    """Convertit des abscisses (numériques ou dates) en flottants pour les calculs géométriques"""
+    if np.issubdtype(x.dtype, np.datetime64):
+        return x.astype('datetime64[ns]').astype(np.int64).astype(float)
+    return x.astype(float)
+
+def _minmax_decimate(x, y, n_buckets):
+    """Décimation min-max : conserve le minimum et le maximum de chaque tranche"""
+    n = len(y)
+    size = int(np.ceil(n / n_buckets))
+    n_buckets = int(np.ceil(n / size))
+    
+    # Compléter la dernière tranche avec la dernière valeur pour pouvoir remodeler
+    padded = np.concatenate([y, np.full(n_buckets * size - n, y[-1])]).reshape(n_buckets, size)
+    base = np.arange(n_buckets) * size
+    idx = np.concatenate([[0, n - 1], base + padded.argmin(axis=1), base + padded.argmax(axis=1)])
+    idx = np.unique(np.minimum(idx, n - 1))
+    
+    return x[idx], y[idx]
+
+def _lttb_downsample(x, y, n_out):
+    """Largest-Triangle-Three-Buckets : réduit la série à n_out points en préservant sa forme"""
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return x, y
+    
+    xf = _as_float(x)
+    # n_out - 2 tranches entre le premier et le dernier point, toujours conservés
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    idx = np.empty(n_out, dtype=int)
+    idx[0], idx[-1] = 0, n - 1
+    
+    a = 0
+    for b in range(n_out - 2):
+        start, end = edges[b], edges[b + 1]
+        if b + 2 < len(edges):
+            nxt = slice(edges[b + 1], edges[b + 2])
+        else:
+            nxt = slice(n - 1, n)
+        avg_x = xf[nxt].mean()
+        avg_y = y[nxt].mean()
+        
+        # Point de la tranche formant le plus grand triangle avec le point précédent et la moyenne suivante
+        area = np.abs((xf[a] - avg_x) * (y[start:end] - y[a]) -
+                      (xf[a] - xf[start:end]) * (avg_y - y[a]))
+        a = start + int(area.argmax())
+        idx[b + 1] = a
+    
+    return x[idx], y[idx]
+
+class KpiExpression:
+    """Indicateur défini par une expression sur les colonnes, compilé une seule fois et évalué sur des tableaux"""
+    
+    # Fonction autorisée -> (implémentation, nombre d'arguments) ; un argument de trop serait pris pour out=
+    FUNCTIONS = {'log': (np.log, 1), 'exp': (np.exp, 1), 'sqrt': (np.sqrt, 1), 'abs': (np.abs, 1), 
+                 'minimum': (np.minimum, 2), 'maximum': (np.maximum, 2), 'where': (np.where, 3)}
+    OPERATORS = (ast.Add, ast.Sub, ast.Mult, ast.Div, ast.Pow, ast.Mod, ast.USub, ast.UAdd, 
+                 ast.Lt, ast.LtE, ast.Gt, ast.GtE, ast.Eq, ast.NotEq)
+    
+    def __init__(self, expression):
+        self.expression = expression
+        try:
+            tree = ast.parse(expression, mode='eval')
+        except SyntaxError as error:
+            raise ValueError(f"Expression invalide '{expression}': {error.msg}") from error
+        self.columns = self._validate(tree)
+        
+        # Constantes en flottants : pas d'arithmétique entière illimitée (9**9**9 échoue aussitôt)
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Constant):
+                node.value = float(node.value)
+        self._code = compile(tree, f'<kpi: {expression}>', 'eval')
+    
+    def _validate(self, tree):
+        """Refuse toute construction hors arithmétique, comparaisons et fonctions autorisées"""
+        columns = []
+        called = set()
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Call):
+                if not isinstance(node.func, ast.Name) or node.func.id not in self.FUNCTIONS or node.keywords:
+                    raise ValueError(f"Fonction non autorisée dans '{self.expression}'")
+                _, arity = self.FUNCTIONS[node.func.id]
+                if len(node.args) != arity:
+                    raise ValueError(f"{node.func.id}() attend {arity} argument(s) dans '{self.expression}'")
+                called.add(id(node.func))
+            elif isinstance(node, ast.Name):
+                if node.id in self.FUNCTIONS:
+                    # ast.walk visite l'appel avant son nom : une fonction hors appel est refusée
+                    if id(node) not in called:
+                        raise ValueError(f"Fonction {node.id} utilisée sans appel dans '{self.expression}'")
+                elif node.id not in columns:
+                    columns.append(node.id)
+            elif isinstance(node, ast.Compare) and len(node.ops) > 1:
+                # Une comparaison chaînée évaluerait la vérité d'un tableau entier
+                raise ValueError(f"Comparaison chaînée non autorisée dans '{self.expression}'")
+            elif isinstance(node, ast.Constant):
+                if not isinstance(node.value, (int, float)):
+                    raise ValueError(f"Constante non numérique dans '{self.expression}'")
+            elif not isinstance(node, (ast.Expression, ast.BinOp, ast.UnaryOp, ast.Compare, 
+                                       ast.Load) + self.OPERATORS):
+                raise ValueError(f"Syntaxe non autorisée dans '{self.expression}': {type(node).__name__}")
+        return columns
+    
+    def evaluate(self, data):
+        """Évalue l'expression sur des colonnes de forme quelconque (périodes, plateformes, scénarios)"""
+        missing = [column for column in self.columns if column not in data]
+        if missing:
+            raise ValueError(f"Colonnes inconnues dans '{self.expression}': {', '.join(missing)}")
+        
+        # Copies : l'expression ne peut jamais écrire dans les données de l'appelant
+        namespace = {column: np.array(data[column], dtype=float) for column in self.columns}
+        functions = {name: function for name, (function, _) in self.FUNCTIONS.items()}
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return eval(self._code, {'__builtins__': {}, **functions}, namespace)
+
+@lru_cache(maxsize=None)
+def compile_kpi(expression):
+    """Compile une expression d'indicateur (mise en cache par expression)"""
+    return KpiExpression(expression)
+
 class MetaFinanceAnalyzer:
-    def __init__(self, platform_name):
+    def __init__(self, platform_name, seed=None, kpis=None):
         self.platform = platform_name
         self.colors = ['#1877F2', '#25D366', '#E4405F', '#F9A602', '#6A0572', 
                       '#AB83A1', '#5CAB7D', '#2A9D8F', '#E76F51', '#264653']
@@ -15,9 +150,36 @@ class MetaFinanceAnalyzer:
         self.start_year = 2010
         self.end_year = 2025
         
+        # Résolution de rendu (export PNG, réduction des courbes) et niveau de détail des graphiques
+        self.dpi = 300
+        self.lod_min_bar_px = 4  # Largeur minimale d'une barre avant regroupement par périodes
+        
         # Configuration spécifique à chaque plateforme
         self.config = self._get_platform_config()
         
+        # Hypothèses de simulation
+        self.seed = seed  # Graine par colonne ; None utilise le générateur de l'instance
+        self.rng = np.random.default_rng(seed)
+        self.growth_factors = {"users": 1.0, "revenue": 1.0, "expenses": 1.0, "investments": 1.0}
+        self.events = {"initial_growth": True, "ipo": True, "acquisitions": True, 
+                       "cambridge_analytica": True, "covid": True, "meta_rebrand": True, 
+                       "regulation": True}
+        
+        # Indicateurs dérivés : expressions sur les colonnes, complétés par le paramètre kpis
+        # puis par config["kpis"] (lu à chaque évaluation)
+        # Parts et ratio LTV/CAC par année ; les sections 3 et 4 des insights gardent les ratios sur la période
+        self.kpis = {
+            "Part_Publicite": "Revenus_Publicite / Revenus_Totaux",
+            "Part_R_D": "R_D / Depenses_Totales",
+            "Part_Infrastructure": "Infrastructure / Depenses_Totales",
+            "Ratio_LTV_CAC": "Vie_Utilisateur / Cout_Acquisition_Utilisateur",
+            "ARPU": "Revenus_Totaux * 1e6 / Utilisateurs_Actifs",
+            "Ratio_Opex": "Depenses_Totales / Revenus_Totaux",
+            "Intensite_Investissement": "(Investissement_IA + Investissement_VR + Investissement_Securite"
+                                        " + Investissement_Croissance + Investissement_Contenu) / Revenus_Totaux",
+        }
+        self.kpis.update(kpis or {})
+        
     def _get_platform_config(self):
         """Retourne la configuration spécifique pour chaque plateforme Meta"""
         configs = {
@@ -55,48 +217,71 @@ class MetaFinanceAnalyzer:
         print(f"📊 Génération des données financières pour {self.platform}...")
         
         # Créer une base de données annuelle
-        dates = pd.date_range(start=f'{self.start_year}-01-01', 
-                             end=f'{self.end_year}-12-31', freq='Y')
+        dates = self._get_dates()
         
         data = {'Annee': [date.year for date in dates]}
-        
-        # Données utilisateurs
-        data['Utilisateurs_Actifs'] = self._simulate_active_users(dates)
-        data['Utilisateurs_Quotidiens'] = self._simulate_daily_users(dates)
-        
-        # Revenus
-        data['Revenus_Totaux'] = self._simulate_total_revenue(dates)
-        data['Revenus_Publicite'] = self._simulate_ad_revenue(dates)
-        data['Revenus_Autres'] = self._simulate_other_revenue(dates)
-        
-        # Dépenses
-        data['Depenses_Totales'] = self._simulate_total_expenses(dates)
-        data['Infrastructure'] = self._simulate_infrastructure_costs(dates)
-        data['R_D'] = self._simulate_randd_costs(dates)
-        data['Marketing'] = self._simulate_marketing_costs(dates)
-        data['Personnel'] = self._simulate_staff_costs(dates)
-        
-        # Indicateurs financiers
-        data['Profit_Net'] = self._simulate_net_profit(dates)
-        data['Marge_Profit'] = self._simulate_profit_margin(dates)
-        data['Cout_Acquisition_Utilisateur'] = self._simulate_cac(dates)
-        data['Vie_Utilisateur'] = self._simulate_lifetime_value(dates)
-        
-        # Investissements par domaine
-        data['Investissement_IA'] = self._simulate_ai_investment(dates)
-        data['Investissement_VR'] = self._simulate_vr_investment(dates)
-        data['Investissement_Securite'] = self._simulate_security_investment(dates)
-        data['Investissement_Croissance'] = self._simulate_growth_investment(dates)
-        data['Investissement_Contenu'] = self._simulate_content_investment(dates)
+        for column in self._column_simulators():
+            data[column] = self._simulate_column(column, dates)
         
         df = pd.DataFrame(data)
         
         # Ajouter des tendances spécifiques à la plateforme
         self._add_platform_trends(df)
         
+        # Indicateurs personnalisés
+        self._add_kpis(df)
+        
         return df
     
-    def _simulate_active_users(self, dates):
+    def _get_dates(self):
+        """Retourne les dates annuelles de la période analysée"""
+        return pd.date_range(start=f'{self.start_year}-01-01', 
+                             end=f'{self.end_year}-12-31', freq='Y')
+    
+    def _column_simulators(self):
+        """Associe chaque colonne simulée à sa méthode et à son groupe d'hypothèses de croissance"""
+        return {
+            # Données utilisateurs
+            'Utilisateurs_Actifs': (self._simulate_active_users, "users"),
+            'Utilisateurs_Quotidiens': (self._simulate_daily_users, "users"),
+            
+            # Revenus
+            'Revenus_Totaux': (self._simulate_total_revenue, "revenue"),
+            'Revenus_Publicite': (self._simulate_ad_revenue, "revenue"),
+            'Revenus_Autres': (self._simulate_other_revenue, "revenue"),
+            
+            # Dépenses
+            'Depenses_Totales': (self._simulate_total_expenses, "expenses"),
+            'Infrastructure': (self._simulate_infrastructure_costs, "expenses"),
+            'R_D': (self._simulate_randd_costs, "expenses"),
+            'Marketing': (self._simulate_marketing_costs, "expenses"),
+            'Personnel': (self._simulate_staff_costs, "expenses"),
+            
+            # Indicateurs financiers
+            'Profit_Net': (self._simulate_net_profit, None),
+            'Marge_Profit': (self._simulate_profit_margin, None),
+            'Cout_Acquisition_Utilisateur': (self._simulate_cac, None),
+            'Vie_Utilisateur': (self._simulate_lifetime_value, None),
+            
+            # Investissements par domaine
+            'Investissement_IA': (self._simulate_ai_investment, "investments"),
+            'Investissement_VR': (self._simulate_vr_investment, "investments"),
+            'Investissement_Securite': (self._simulate_security_investment, "investments"),
+            'Investissement_Croissance': (self._simulate_growth_investment, "investments"),
+            'Investissement_Contenu': (self._simulate_content_investment, "investments"),
+        }
+    
+    def _simulate_column(self, column, dates):
+        """Simule une colonne ; avec une graine, chaque colonne a son propre générateur reproductible"""
+        simulators = self._column_simulators()
+        simulate, _ = simulators[column]
+        if self.seed is not None:
+            rng = np.random.default_rng([self.seed, list(simulators).index(column)])
+        else:
+            rng = self.rng
+        return simulate(dates, rng)
+    
+    def _simulate_active_users(self, dates, rng):
         """Simule le nombre d'utilisateurs actifs"""
         base_users = self.config["users_base"]
         
@@ -118,23 +303,23 @@ class MetaFinanceAnalyzer:
             else:
                 growth_rate = 0.08
                 
-            growth = 1 + growth_rate * i
+            growth = 1 + growth_rate * self.growth_factors['users'] * i
             users.append(base_users * growth)
         
         return users
     
-    def _simulate_daily_users(self, dates):
+    def _simulate_daily_users(self, dates, rng):
         """Simule le nombre d'utilisateurs quotidiens"""
         base_daily = self.config["users_base"] * 0.65  # 65% des utilisateurs actifs sont quotidiens
         
         daily_users = []
         for i, date in enumerate(dates):
-            growth = 1 + 0.07 * i
+            growth = 1 + 0.07 * self.growth_factors['users'] * i
             daily_users.append(base_daily * growth)
         
         return daily_users
     
-    def _simulate_total_revenue(self, dates):
+    def _simulate_total_revenue(self, dates, rng):
         """Simule les revenus totaux"""
         base_revenue = self.config["revenue_base"] * 1000  # Conversion en millions
         
@@ -150,97 +335,97 @@ class MetaFinanceAnalyzer:
             else:
                 growth_rate = 0.20
                 
-            growth = 1 + growth_rate * i
-            noise = np.random.normal(1, 0.10)
+            growth = 1 + growth_rate * self.growth_factors['revenue'] * i
+            noise = rng.normal(1, 0.10)
             revenue.append(base_revenue * growth * noise)
         
         return revenue
     
-    def _simulate_ad_revenue(self, dates):
+    def _simulate_ad_revenue(self, dates, rng):
         """Simule les revenus publicitaires"""
         base_ad_revenue = self.config["revenue_base"] * 1000 * 0.98  # 98% des revenus viennent de la pub
         
         ad_revenue = []
         for i, date in enumerate(dates):
-            growth = 1 + 0.22 * i
-            noise = np.random.normal(1, 0.12)
+            growth = 1 + 0.22 * self.growth_factors['revenue'] * i
+            noise = rng.normal(1, 0.12)
             ad_revenue.append(base_ad_revenue * growth * noise)
         
         return ad_revenue
     
-    def _simulate_other_revenue(self, dates):
+    def _simulate_other_revenue(self, dates, rng):
         """Simule les autres revenus"""
         base_other = self.config["revenue_base"] * 1000 * 0.02  # 2% des revenus viennent d'autres sources
         
         other_revenue = []
         for i, date in enumerate(dates):
-            growth = 1 + 0.30 * i  # Croissance plus forte pour les revenus non-publicitaires
-            noise = np.random.normal(1, 0.15)
+            growth = 1 + 0.30 * self.growth_factors['revenue'] * i  # Croissance plus forte pour les revenus non-publicitaires
+            noise = rng.normal(1, 0.15)
             other_revenue.append(base_other * growth * noise)
         
         return other_revenue
     
-    def _simulate_total_expenses(self, dates):
+    def _simulate_total_expenses(self, dates, rng):
         """Simule les dépenses totales"""
         base_expenses = self.config["revenue_base"] * 1000 * 0.65  # Dépenses à 65% des revenus
         
         expenses = []
         for i, date in enumerate(dates):
-            growth = 1 + 0.20 * i
-            noise = np.random.normal(1, 0.08)
+            growth = 1 + 0.20 * self.growth_factors['expenses'] * i
+            noise = rng.normal(1, 0.08)
             expenses.append(base_expenses * growth * noise)
         
         return expenses
     
-    def _simulate_infrastructure_costs(self, dates):
+    def _simulate_infrastructure_costs(self, dates, rng):
         """Simule les coûts d'infrastructure"""
         base_infra = self.config["revenue_base"] * 1000 * 0.20  # 20% des revenus pour l'infrastructure
         
         infra_costs = []
         for i, date in enumerate(dates):
-            growth = 1 + 0.15 * i
-            noise = np.random.normal(1, 0.07)
+            growth = 1 + 0.15 * self.growth_factors['expenses'] * i
+            noise = rng.normal(1, 0.07)
             infra_costs.append(base_infra * growth * noise)
         
         return infra_costs
     
-    def _simulate_randd_costs(self, dates):
+    def _simulate_randd_costs(self, dates, rng):
         """Simule les coûts de R&D"""
         base_randd = self.config["revenue_base"] * 1000 * 0.15  # 15% des revenus pour la R&D
         
         randd_costs = []
         for i, date in enumerate(dates):
-            growth = 1 + 0.18 * i
-            noise = np.random.normal(1, 0.09)
+            growth = 1 + 0.18 * self.growth_factors['expenses'] * i
+            noise = rng.normal(1, 0.09)
             randd_costs.append(base_randd * growth * noise)
         
         return randd_costs
     
-    def _simulate_marketing_costs(self, dates):
+    def _simulate_marketing_costs(self, dates, rng):
         """Simule les coûts marketing"""
         base_marketing = self.config["revenue_base"] * 1000 * 0.10  # 10% des revenus pour le marketing
         
         marketing_costs = []
         for i, date in enumerate(dates):
-            growth = 1 + 0.12 * i
-            noise = np.random.normal(1, 0.11)
+            growth = 1 + 0.12 * self.growth_factors['expenses'] * i
+            noise = rng.normal(1, 0.11)
             marketing_costs.append(base_marketing * growth * noise)
         
         return marketing_costs
     
-    def _simulate_staff_costs(self, dates):
+    def _simulate_staff_costs(self, dates, rng):
         """Simule les coûts de personnel"""
         base_staff = self.config["revenue_base"] * 1000 * 0.20  # 20% des revenus pour le personnel
         
         staff_costs = []
         for i, date in enumerate(dates):
-            growth = 1 + 0.10 * i
-            noise = np.random.normal(1, 0.06)
+            growth = 1 + 0.10 * self.growth_factors['expenses'] * i
+            noise = rng.normal(1, 0.06)
             staff_costs.append(base_staff * growth * noise)
         
         return staff_costs
     
-    def _simulate_net_profit(self, dates):
+    def _simulate_net_profit(self, dates, rng):
         """Simule le profit net"""
         profit = []
         for i, date in enumerate(dates):
@@ -252,12 +437,12 @@ class MetaFinanceAnalyzer:
             else:
                 improvement = 1
             
-            noise = np.random.normal(1, 0.12)
+            noise = rng.normal(1, 0.12)
             profit.append(base_profit * improvement * noise)
         
         return profit
     
-    def _simulate_profit_margin(self, dates):
+    def _simulate_profit_margin(self, dates, rng):
         """Simule la marge de profit"""
         margins = []
         for i, date in enumerate(dates):
@@ -269,12 +454,12 @@ class MetaFinanceAnalyzer:
             else:
                 improvement = 1
             
-            noise = np.random.normal(1, 0.05)
+            noise = rng.normal(1, 0.05)
             margins.append(base_margin * improvement * noise)
         
         return margins
     
-    def _simulate_cac(self, dates):
+    def _simulate_cac(self, dates, rng):
         """Simule le coût d'acquisition utilisateur"""
         cac_values = []
         for i, date in enumerate(dates):
@@ -286,12 +471,12 @@ class MetaFinanceAnalyzer:
             else:
                 increase = 1
             
-            noise = np.random.normal(1, 0.08)
+            noise = rng.normal(1, 0.08)
             cac_values.append(base_cac * increase * noise)
         
         return cac_values
     
-    def _simulate_lifetime_value(self, dates):
+    def _simulate_lifetime_value(self, dates, rng):
         """Simule la valeur vie utilisateur"""
         ltv_values = []
         for i, date in enumerate(dates):
@@ -303,12 +488,12 @@ class MetaFinanceAnalyzer:
             else:
                 increase = 1
             
-            noise = np.random.normal(1, 0.07)
+            noise = rng.normal(1, 0.07)
             ltv_values.append(base_ltv * increase * noise)
         
         return ltv_values
     
-    def _simulate_ai_investment(self, dates):
+    def _simulate_ai_investment(self, dates, rng):
         """Simule l'investissement en IA"""
         base_investment = self.config["revenue_base"] * 1000 * 0.08
         
@@ -323,13 +508,13 @@ class MetaFinanceAnalyzer:
             else:
                 year_multiplier = 1.0
             
-            growth = 1 + 0.25 * i
-            noise = np.random.normal(1, 0.15)
+            growth = 1 + 0.25 * self.growth_factors['investments'] * i
+            noise = rng.normal(1, 0.15)
             investment.append(base_investment * growth * year_multiplier * multiplier * noise)
         
         return investment
     
-    def _simulate_vr_investment(self, dates):
+    def _simulate_vr_investment(self, dates, rng):
         """Simule l'investissement en réalité virtuelle"""
         base_investment = self.config["revenue_base"] * 1000 * 0.05
         
@@ -344,13 +529,13 @@ class MetaFinanceAnalyzer:
             else:
                 year_multiplier = 1.0
             
-            growth = 1 + 0.20 * i
-            noise = np.random.normal(1, 0.18)
+            growth = 1 + 0.20 * self.growth_factors['investments'] * i
+            noise = rng.normal(1, 0.18)
             investment.append(base_investment * growth * year_multiplier * multiplier * noise)
         
         return investment
     
-    def _simulate_security_investment(self, dates):
+    def _simulate_security_investment(self, dates, rng):
         """Simule l'investissement en sécurité"""
         base_investment = self.config["revenue_base"] * 1000 * 0.04
         
@@ -362,13 +547,13 @@ class MetaFinanceAnalyzer:
             else:
                 year_multiplier = 1.0
             
-            growth = 1 + 0.15 * i
-            noise = np.random.normal(1, 0.12)
+            growth = 1 + 0.15 * self.growth_factors['investments'] * i
+            noise = rng.normal(1, 0.12)
             investment.append(base_investment * growth * year_multiplier * noise)
         
         return investment
     
-    def _simulate_growth_investment(self, dates):
+    def _simulate_growth_investment(self, dates, rng):
         """Simule l'investissement en croissance"""
         base_investment = self.config["revenue_base"] * 1000 * 0.07
         
@@ -380,13 +565,13 @@ class MetaFinanceAnalyzer:
             else:
                 year_multiplier = 1.0
             
-            growth = 1 + 0.18 * i
-            noise = np.random.normal(1, 0.14)
+            growth = 1 + 0.18 * self.growth_factors['investments'] * i
+            noise = rng.normal(1, 0.14)
             investment.append(base_investment * growth * year_multiplier * noise)
         
         return investment
     
-    def _simulate_content_investment(self, dates):
+    def _simulate_content_investment(self, dates, rng):
         """Simule l'investissement en contenu"""
         base_investment = self.config["revenue_base"] * 1000 * 0.06
         
@@ -401,8 +586,8 @@ class MetaFinanceAnalyzer:
             else:
                 year_multiplier = 1.0
             
-            growth = 1 + 0.16 * i
-            noise = np.random.normal(1, 0.13)
+            growth = 1 + 0.16 * self.growth_factors['investments'] * i
+            noise = rng.normal(1, 0.13)
             investment.append(base_investment * growth * year_multiplier * multiplier * noise)
         
         return investment
@@ -413,93 +598,180 @@ class MetaFinanceAnalyzer:
             year = row['Annee']
             
             # Croissance initiale (2010-2012)
-            if 2010 <= year <= 2012:
+            if self.events['initial_growth'] and 2010 <= year <= 2012:
                 df.loc[i, 'Revenus_Totaux'] *= 1.2
                 df.loc[i, 'Utilisateurs_Actifs'] *= 1.15
             
             # Introduction en bourse (2012)
-            if year == 2012:
+            if self.events['ipo'] and year == 2012:
                 df.loc[i, 'Revenus_Totaux'] *= 1.25
                 df.loc[i, 'Investissement_Croissance'] *= 1.5
             
             # Acquisition d'Instagram (2012) et WhatsApp (2014)
-            if year == 2013:
+            if self.events['acquisitions'] and year == 2013:
                 df.loc[i, 'Utilisateurs_Actifs'] *= 1.1
-            if year == 2015:
+            if self.events['acquisitions'] and year == 2015:
                 df.loc[i, 'Utilisateurs_Actifs'] *= 1.15
             
             # Scandale Cambridge Analytica (2018)
-            if year == 2018:
+            if self.events['cambridge_analytica'] and year == 2018:
                 df.loc[i, 'Utilisateurs_Actifs'] *= 0.97
                 df.loc[i, 'Investissement_Securite'] *= 1.8
             
             # Pandémie COVID-19 (2020)
-            if year == 2020:
+            if self.events['covid'] and year == 2020:
                 df.loc[i, 'Utilisateurs_Actifs'] *= 1.12
                 df.loc[i, 'Utilisateurs_Quotidiens'] *= 1.15
                 df.loc[i, 'Revenus_Publicite'] *= 0.92
             
             # Changement de nom en Meta (2021)
-            if year == 2021:
+            if self.events['meta_rebrand'] and year == 2021:
                 df.loc[i, 'Investissement_VR'] *= 1.5
                 df.loc[i, 'Investissement_IA'] *= 1.3
             
             # Défis réglementaires (2022-2023)
-            if 2022 <= year <= 2023:
+            if self.events['regulation'] and 2022 <= year <= 2023:
                 df.loc[i, 'Depenses_Totales'] *= 1.1
                 df.loc[i, 'Investissement_Securite'] *= 1.2
     
-    def create_financial_analysis(self, df):
+    def _kpi_definitions(self):
+        """Indicateurs à calculer : ceux de l'analyseur, complétés ou remplacés par config["kpis"]"""
+        return {**self.kpis, **self.config.get("kpis", {})}
+    
+    def _add_kpis(self, df):
+        """Ajoute les indicateurs personnalisés, évalués sur toutes les lignes en une fois"""
+        for name, expression in self._kpi_definitions().items():
+            # Un indicateur peut réutiliser ceux définis avant lui
+            df[name] = compile_kpi(expression).evaluate(df)
+    
+    def create_financial_analysis(self, df, show=True):
         """Crée une analyse complète des finances de la plateforme"""
-        plt.style.use('seaborn-v0_8')
-        fig = plt.figure(figsize=(20, 24))
-        
-        # 1. Évolution des revenus et dépenses
-        ax1 = plt.subplot(4, 2, 1)
-        self._plot_revenue_expenses(df, ax1)
-        
-        # 2. Structure des revenus
-        ax2 = plt.subplot(4, 2, 2)
-        self._plot_revenue_structure(df, ax2)
-        
-        # 3. Structure des dépenses
-        ax3 = plt.subplot(4, 2, 3)
-        self._plot_expenses_structure(df, ax3)
-        
-        # 4. Investissements stratégiques
-        ax4 = plt.subplot(4, 2, 4)
-        self._plot_investments(df, ax4)
-        
-        # 5. Utilisateurs et engagement
-        ax5 = plt.subplot(4, 2, 5)
-        self._plot_users_engagement(df, ax5)
-        
-        # 6. Indicateurs de performance
-        ax6 = plt.subplot(4, 2, 6)
-        self._plot_performance_indicators(df, ax6)
-        
-        # 7. Profitabilité
-        ax7 = plt.subplot(4, 2, 7)
-        self._plot_profitability(df, ax7)
-        
-        # 8. Investissements sectoriels
-        ax8 = plt.subplot(4, 2, 8)
-        self._plot_sectorial_investments(df, ax8)
-        
-        plt.suptitle(f'Analyse Financière de {self.platform} - Meta ({self.start_year}-{self.end_year})', 
-                    fontsize=16, fontweight='bold')
-        plt.tight_layout()
-        plt.savefig(f'{self.platform}_financial_analysis.png', dpi=300, bbox_inches='tight')
-        plt.show()
+        # Sans affichage, aucune figure pyplot : l'appel peut se faire depuis n'importe quel thread
+        fig = plt.figure(figsize=(20, 24)) if show else None
+        fig = self.render_financial_analysis(df, fig)
+        fig.savefig(f'{self.platform}_financial_analysis.png', dpi=self.dpi, bbox_inches='tight')
+        if show:
+            plt.show()
         
         # Générer les insights
         self._generate_financial_insights(df)
     
+    def render_financial_analysis(self, df, fig=None, rect=None):
+        """Dessine les huit graphiques sur une Figure explicite (créée hors pyplot par défaut)
+        
+        rect limite les graphiques à une zone de la figure (left, bottom, right, top), 
+        pour laisser de la place à d'autres éléments sur la même page.
+        """
+        # Le style modifie rcParams, global au processus : seule la construction des artistes est verrouillée
+        with _STYLE_LOCK, plt.style.context('seaborn-v0_8'):
+            if fig is None:
+                fig = Figure(figsize=(20, 24))
+                FigureCanvasAgg(fig)
+            
+            # 1. Évolution des revenus et dépenses
+            ax1 = fig.add_subplot(4, 2, 1)
+            self._plot_revenue_expenses(df, ax1)
+            
+            # 2. Structure des revenus
+            ax2 = fig.add_subplot(4, 2, 2)
+            self._plot_revenue_structure(df, ax2)
+            
+            # 3. Structure des dépenses
+            ax3 = fig.add_subplot(4, 2, 3)
+            self._plot_expenses_structure(df, ax3)
+            
+            # 4. Investissements stratégiques
+            ax4 = fig.add_subplot(4, 2, 4)
+            self._plot_investments(df, ax4)
+            
+            # 5. Utilisateurs et engagement
+            ax5 = fig.add_subplot(4, 2, 5)
+            self._plot_users_engagement(df, ax5)
+            
+            # 6. Indicateurs de performance
+            ax6 = fig.add_subplot(4, 2, 6)
+            self._plot_performance_indicators(df, ax6)
+            
+            # 7. Profitabilité
+            ax7 = fig.add_subplot(4, 2, 7)
+            self._plot_profitability(df, ax7)
+            
+            # 8. Investissements sectoriels
+            ax8 = fig.add_subplot(4, 2, 8)
+            self._plot_sectorial_investments(df, ax8)
+            
+            fig.suptitle(f'Analyse Financière de {self.platform} - Meta ({self.start_year}-{self.end_year})', 
+                         fontsize=16, fontweight='bold')
+            fig.tight_layout(rect=rect)
+        
+        return fig
+    
+    def _lod_budget(self, ax):
+        """Nombre de pixels horizontaux de l'axe à la résolution de rendu (self.dpi)"""
+        fig = ax.get_figure()
+        width_inches = ax.get_position().width * fig.get_figwidth()
+        return max(int(width_inches * self.dpi), 3)
+    
+    def _plot_line(self, ax, x, y, **kwargs):
+        """Trace une courbe réduite au nombre de pixels disponibles (min-max puis LTTB)"""
+        x = np.asarray(x)
+        y = np.asarray(y, dtype=float)
+        budget = self._lod_budget(ax)
+        
+        if len(y) > budget:
+            # Pré-agrégation min-max pour borner le coût de LTTB sur les très longues séries
+            if len(y) > 4 * budget:
+                x, y = _minmax_decimate(x, y, 2 * budget)
+            x, y = _lttb_downsample(x, y, budget)
+        
+        return ax.plot(x, y, **kwargs)
+    
+    def _lod_bars(self, ax, x, columns, width=0.8):
+        """Regroupe les barres par périodes lorsqu'elles deviennent plus fines que lod_min_bar_px"""
+        columns = [np.asarray(column, dtype=float) for column in columns]
+        max_bars = max(self._lod_budget(ax) // self.lod_min_bar_px, 1)
+        if len(x) <= max_bars:
+            return np.asarray(x), columns, width
+        
+        # Moyenne par période : les montants restent exprimés par année
+        x = np.asarray(x, dtype=float)
+        period = int(np.ceil(len(x) / max_bars))
+        starts = np.arange(0, len(x), period)
+        counts = np.diff(np.append(starts, len(x)))
+        x_periods = np.add.reduceat(x, starts) / counts
+        columns = [np.add.reduceat(column, starts) / counts for column in columns]
+        
+        return x_periods, columns, width * period
+    
+    def _plot_stacked_bars(self, ax, x, columns, colors, labels, width=0.8):
+        """Trace des barres empilées avec une seule collection de rectangles par catégorie"""
+        x, columns, width = self._lod_bars(ax, x, columns, width)
+        x = np.asarray(x, dtype=float)
+        
+        # Empilement calculé une seule fois pour toutes les catégories
+        values = np.vstack(columns)
+        tops = np.cumsum(values, axis=0)
+        bottoms = tops - values
+        left = x - width / 2
+        right = x + width / 2
+        
+        for i in range(len(values)):
+            verts = np.stack([np.column_stack([left, bottoms[i]]),
+                              np.column_stack([left, tops[i]]),
+                              np.column_stack([right, tops[i]]),
+                              np.column_stack([right, bottoms[i]])], axis=1)
+            layer = PolyCollection(verts, facecolors=colors[i], edgecolors='none', label=labels[i])
+            # Comme ax.bar : pas de marge sous la base des barres
+            layer.sticky_edges.y.append(0)
+            ax.add_collection(layer)
+        
+        ax.autoscale_view()
+    
     def _plot_revenue_expenses(self, df, ax):
         """Plot de l'évolution des revenus et dépenses"""
-        ax.plot(df['Annee'], df['Revenus_Totaux'], label='Revenus Totaux', 
+        self._plot_line(ax, df['Annee'], df['Revenus_Totaux'], label='Revenus Totaux', 
                linewidth=2, color='#1877F2', alpha=0.8)
-        ax.plot(df['Annee'], df['Depenses_Totales'], label='Dépenses Totales', 
+        self._plot_line(ax, df['Annee'], df['Depenses_Totales'], label='Dépenses Totales', 
                linewidth=2, color='#E4405F', alpha=0.8)
         
         ax.set_title('Évolution des Revenus et Dépenses (M$)', 
@@ -513,14 +785,12 @@ class MetaFinanceAnalyzer:
         years = df['Annee']
         width = 0.8
         
-        bottom = np.zeros(len(years))
         categories = ['Revenus_Publicite', 'Revenus_Autres']
         colors = ['#1877F2', '#25D366']
         labels = ['Revenus Publicitaires', 'Autres Revenus']
         
-        for i, category in enumerate(categories):
-            ax.bar(years, df[category], width, label=labels[i], bottom=bottom, color=colors[i])
-            bottom += df[category]
+        self._plot_stacked_bars(ax, years, [df[category] for category in categories], 
+                                colors, labels, width)
         
         ax.set_title('Structure des Revenus (M$)', fontsize=12, fontweight='bold')
         ax.set_ylabel('Montants (M$)')
@@ -532,14 +802,12 @@ class MetaFinanceAnalyzer:
         years = df['Annee']
         width = 0.8
         
-        bottom = np.zeros(len(years))
         categories = ['Infrastructure', 'R_D', 'Marketing', 'Personnel']
         colors = ['#1877F2', '#25D366', '#E4405F', '#F9A602']
         labels = ['Infrastructure', 'R&D', 'Marketing', 'Personnel']
         
-        for i, category in enumerate(categories):
-            ax.bar(years, df[category], width, label=labels[i], bottom=bottom, color=colors[i])
-            bottom += df[category]
+        self._plot_stacked_bars(ax, years, [df[category] for category in categories], 
+                                colors, labels, width)
         
         ax.set_title('Structure des Dépenses (M$)', fontsize=12, fontweight='bold')
         ax.set_ylabel('Montants (M$)')
@@ -548,15 +816,15 @@ class MetaFinanceAnalyzer:
     
     def _plot_investments(self, df, ax):
         """Plot des investissements stratégiques"""
-        ax.plot(df['Annee'], df['Investissement_IA'], label='Intelligence Artificielle', 
+        self._plot_line(ax, df['Annee'], df['Investissement_IA'], label='Intelligence Artificielle', 
                linewidth=2, color='#1877F2', alpha=0.8)
-        ax.plot(df['Annee'], df['Investissement_VR'], label='Réalité Virtuelle', 
+        self._plot_line(ax, df['Annee'], df['Investissement_VR'], label='Réalité Virtuelle', 
                linewidth=2, color='#25D366', alpha=0.8)
-        ax.plot(df['Annee'], df['Investissement_Securite'], label='Sécurité', 
+        self._plot_line(ax, df['Annee'], df['Investissement_Securite'], label='Sécurité', 
                linewidth=2, color='#E4405F', alpha=0.8)
-        ax.plot(df['Annee'], df['Investissement_Croissance'], label='Croissance', 
+        self._plot_line(ax, df['Annee'], df['Investissement_Croissance'], label='Croissance', 
                linewidth=2, color='#F9A602', alpha=0.8)
-        ax.plot(df['Annee'], df['Investissement_Contenu'], label='Contenu', 
+        self._plot_line(ax, df['Annee'], df['Investissement_Contenu'], label='Contenu', 
                linewidth=2, color='#6A0572', alpha=0.8)
         
         ax.set_title('Répartition des Investissements Stratégiques (M$)', fontsize=12, fontweight='bold')
@@ -566,7 +834,7 @@ class MetaFinanceAnalyzer:
     
     def _plot_users_engagement(self, df, ax):
         """Plot des utilisateurs et engagement"""
-        ax.plot(df['Annee'], df['Utilisateurs_Actifs'], label='Utilisateurs Actifs', 
+        self._plot_line(ax, df['Annee'], df['Utilisateurs_Actifs'], label='Utilisateurs Actifs', 
                linewidth=2, color='#1877F2', alpha=0.8)
         
         ax.set_title('Utilisateurs et Engagement', fontsize=12, fontweight='bold')
@@ -576,7 +844,7 @@ class MetaFinanceAnalyzer:
         
         # Utilisateurs quotidiens en second axe
         ax2 = ax.twinx()
-        ax2.plot(df['Annee'], df['Utilisateurs_Quotidiens'], label='Utilisateurs Quotidiens', 
+        self._plot_line(ax2, df['Annee'], df['Utilisateurs_Quotidiens'], label='Utilisateurs Quotidiens', 
                 linewidth=2, color='#25D366', alpha=0.8)
         ax2.set_ylabel('Utilisateurs Quotidiens', color='#25D366')
         ax2.tick_params(axis='y', labelcolor='#25D366')
@@ -589,7 +857,7 @@ class MetaFinanceAnalyzer:
     def _plot_performance_indicators(self, df, ax):
         """Plot des indicateurs de performance"""
         # Coût d'acquisition utilisateur
-        ax.plot(df['Annee'], df['Cout_Acquisition_Utilisateur'], label='Coût d\'Acquisition (CAC)', 
+        self._plot_line(ax, df['Annee'], df['Cout_Acquisition_Utilisateur'], label='Coût d\'Acquisition (CAC)', 
                linewidth=2, color='#E4405F', alpha=0.8)
         
         ax.set_title('Indicateurs de Performance', fontsize=12, fontweight='bold')
@@ -599,7 +867,7 @@ class MetaFinanceAnalyzer:
         
         # Valeur vie utilisateur en second axe
         ax2 = ax.twinx()
-        ax2.plot(df['Annee'], df['Vie_Utilisateur'], label='Valeur Vie Utilisateur (LTV)', 
+        self._plot_line(ax2, df['Annee'], df['Vie_Utilisateur'], label='Valeur Vie Utilisateur (LTV)', 
                 linewidth=2, color='#1877F2', alpha=0.8)
         ax2.set_ylabel('Valeur Vie Utilisateur (LTV)', color='#1877F2')
         ax2.tick_params(axis='y', labelcolor='#1877F2')
@@ -612,7 +880,8 @@ class MetaFinanceAnalyzer:
     def _plot_profitability(self, df, ax):
         """Plot de la profitabilité"""
         # Profit net
-        ax.bar(df['Annee'], df['Profit_Net'], label='Profit Net (M$)', 
+        years, (profit,), width = self._lod_bars(ax, df['Annee'], [df['Profit_Net']])
+        ax.bar(years, profit, width, label='Profit Net (M$)', 
               color='#25D366', alpha=0.7)
         
         ax.set_title('Profitabilité', fontsize=12, fontweight='bold')
@@ -622,7 +891,7 @@ class MetaFinanceAnalyzer:
         
         # Marge de profit en second axe
         ax2 = ax.twinx()
-        ax2.plot(df['Annee'], df['Marge_Profit'], label='Marge de Profit', 
+        self._plot_line(ax2, df['Annee'], df['Marge_Profit'], label='Marge de Profit', 
                 linewidth=3, color='#1877F2')
         ax2.set_ylabel('Marge de Profit', color='#1877F2')
         ax2.tick_params(axis='y', labelcolor='#1877F2')
@@ -637,7 +906,6 @@ class MetaFinanceAnalyzer:
         years = df['Annee']
         width = 0.8
         
-        bottom = np.zeros(len(years))
         categories = ['Investissement_IA', 'Investissement_VR', 
                      'Investissement_Securite', 'Investissement_Croissance', 
                      'Investissement_Contenu']
@@ -645,9 +913,8 @@ class MetaFinanceAnalyzer:
         colors = ['#1877F2', '#25D366', '#E4405F', '#F9A602', '#6A0572']
         labels = ['IA', 'RV', 'Sécurité', 'Croissance', 'Contenu']
         
-        for i, category in enumerate(categories):
-            ax.bar(years, df[category], width, label=labels[i], bottom=bottom, color=colors[i])
-            bottom += df[category]
+        self._plot_stacked_bars(ax, years, [df[category] for category in categories], 
+                                colors, labels, width)
         
         ax.set_title('Répartition Sectorielle des Investissements (M$)', fontsize=12, fontweight='bold')
         ax.set_ylabel('Montants (M$)')
@@ -656,86 +923,403 @@ class MetaFinanceAnalyzer:
     
     def _generate_financial_insights(self, df):
         """Génère des insights analytiques adaptés aux plateformes Meta"""
-        print(f"📊 INSIGHTS ANALYTIQUES - {self.platform} (Meta)")
-        print("=" * 60)
+        print("\n".join(self._financial_insights(df)))
+    
+    def _financial_insights(self, df):
+        """Retourne les lignes des insights analytiques, sans écrire sur la sortie standard"""
+        lines = []
+        
+        lines.append(f"📊 INSIGHTS ANALYTIQUES - {self.platform} (Meta)")
+        lines.append("=" * 60)
         
         # 1. Statistiques de base
-        print("\n1. 📈 STATISTIQUES GÉNÉRALES:")
+        lines.append("\n1. 📈 STATISTIQUES GÉNÉRALES:")
         avg_revenue = df['Revenus_Totaux'].mean()
         avg_expenses = df['Depenses_Totales'].mean()
         avg_profit = df['Profit_Net'].mean()
         avg_users = df['Utilisateurs_Actifs'].mean()
         
-        print(f"Revenus moyens annuels: {avg_revenue:.2f} M$")
-        print(f"Dépenses moyennes annuelles: {avg_expenses:.2f} M$")
-        print(f"Profit net moyen: {avg_profit:.2f} M$")
-        print(f"Utilisateurs actifs moyens: {avg_users/1000000:.2f} M")
+        lines.append(f"Revenus moyens annuels: {avg_revenue:.2f} M$")
+        lines.append(f"Dépenses moyennes annuelles: {avg_expenses:.2f} M$")
+        lines.append(f"Profit net moyen: {avg_profit:.2f} M$")
+        lines.append(f"Utilisateurs actifs moyens: {avg_users/1000000:.2f} M")
         
         # 2. Croissance
-        print("\n2. 📊 TAUX DE CROISSANCE:")
+        lines.append("\n2. 📊 TAUX DE CROISSANCE:")
         revenue_growth = ((df['Revenus_Totaux'].iloc[-1] / 
                           df['Revenus_Totaux'].iloc[0]) - 1) * 100
         user_growth = ((df['Utilisateurs_Actifs'].iloc[-1] / 
                        df['Utilisateurs_Actifs'].iloc[0]) - 1) * 100
         
-        print(f"Croissance des revenus ({self.start_year}-{self.end_year}): {revenue_growth:.1f}%")
-        print(f"Croissance des utilisateurs ({self.start_year}-{self.end_year}): {user_growth:.1f}%")
+        lines.append(f"Croissance des revenus ({self.start_year}-{self.end_year}): {revenue_growth:.1f}%")
+        lines.append(f"Croissance des utilisateurs ({self.start_year}-{self.end_year}): {user_growth:.1f}%")
         
         # 3. Structure financière
-        print("\n3. 📋 STRUCTURE FINANCIÈRE:")
+        lines.append("\n3. 📋 STRUCTURE FINANCIÈRE:")
         ad_share = (df['Revenus_Publicite'].mean() / df['Revenus_Totaux'].mean()) * 100
         randd_share = (df['R_D'].mean() / df['Depenses_Totales'].mean()) * 100
         infra_share = (df['Infrastructure'].mean() / df['Depenses_Totales'].mean()) * 100
         
-        print(f"Part de la publicité dans les revenus: {ad_share:.1f}%")
-        print(f"Part de la R&D dans les dépenses: {randd_share:.1f}%")
-        print(f"Part de l'infrastructure dans les dépenses: {infra_share:.1f}%")
+        lines.append(f"Part de la publicité dans les revenus: {ad_share:.1f}%")
+        lines.append(f"Part de la R&D dans les dépenses: {randd_share:.1f}%")
+        lines.append(f"Part de l'infrastructure dans les dépenses: {infra_share:.1f}%")
         
         # 4. Performance
-        print("\n4. 💰 INDICATEURS DE PERFORMANCE:")
+        lines.append("\n4. 💰 INDICATEURS DE PERFORMANCE:")
         avg_profit_margin = df['Marge_Profit'].mean() * 100
         avg_cac = df['Cout_Acquisition_Utilisateur'].mean()
         avg_ltv = df['Vie_Utilisateur'].mean()
         ltv_cac_ratio = avg_ltv / avg_cac
         
-        print(f"Marge de profit moyenne: {avg_profit_margin:.1f}%")
-        print(f"Coût d'acquisition utilisateur moyen: {avg_cac:.2f} $")
-        print(f"Valeur vie utilisateur moyenne: {avg_ltv:.2f} $")
-        print(f"Ratio LTV/CAC: {ltv_cac_ratio:.2f}")
+        lines.append(f"Marge de profit moyenne: {avg_profit_margin:.1f}%")
+        lines.append(f"Coût d'acquisition utilisateur moyen: {avg_cac:.2f} $")
+        lines.append(f"Valeur vie utilisateur moyenne: {avg_ltv:.2f} $")
+        lines.append(f"Ratio LTV/CAC: {ltv_cac_ratio:.2f}")
         
         # 5. Spécificités de la plateforme
-        print(f"\n5. 🌟 SPÉCIFICITÉS DE {self.platform.upper()}:")
-        print(f"Type de plateforme: {self.config['type']}")
-        print(f"Spécialités: {', '.join(self.config['specialites'])}")
+        lines.append(f"\n5. 🌟 SPÉCIFICITÉS DE {self.platform.upper()}:")
+        lines.append(f"Type de plateforme: {self.config['type']}")
+        lines.append(f"Spécialités: {', '.join(self.config['specialites'])}")
         
         # 6. Événements marquants
-        print("\n6. 📅 ÉVÉNEMENTS MARQUANTS:")
-        print("• 2012: Introduction en bourse de Facebook")
-        print("• 2012-2014: Acquisitions d'Instagram et WhatsApp")
-        print("• 2018: Scandale Cambridge Analytica et renforcement de la sécurité")
-        print("• 2020: Pandémie COVID-19 - augmentation de l'utilisation")
-        print("• 2021: Changement de nom en Meta et accent sur le métavers")
-        print("• 2022-2023: Défis réglementaires et concurrence accrue")
+        lines.append("\n6. 📅 ÉVÉNEMENTS MARQUANTS:")
+        lines.append("• 2012: Introduction en bourse de Facebook")
+        lines.append("• 2012-2014: Acquisitions d'Instagram et WhatsApp")
+        lines.append("• 2018: Scandale Cambridge Analytica et renforcement de la sécurité")
+        lines.append("• 2020: Pandémie COVID-19 - augmentation de l'utilisation")
+        lines.append("• 2021: Changement de nom en Meta et accent sur le métavers")
+        lines.append("• 2022-2023: Défis réglementaires et concurrence accrue")
         
         # 7. Recommandations stratégiques
-        print("\n7. 💡 RECOMMANDATIONS STRATÉGIQUES:")
+        lines.append("\n7. 💡 RECOMMANDATIONS STRATÉGIQUES:")
         if self.platform == "Facebook":
-            print("• Diversifier les sources de revenus au-delà de la publicité")
-            print("• Améliorer l'engagement des jeunes utilisateurs")
-            print("• Développer les fonctionnalités de commerce électronique")
+            lines.append("• Diversifier les sources de revenus au-delà de la publicité")
+            lines.append("• Améliorer l'engagement des jeunes utilisateurs")
+            lines.append("• Développer les fonctionnalités de commerce électronique")
         elif self.platform == "Instagram":
-            print("• Contrer la concurrence de TikTok avec des fonctionnalités innovantes")
-            print("• Développer les outils pour créateurs de contenu")
-            print("• Améliorer la monétisation des Reels")
+            lines.append("• Contrer la concurrence de TikTok avec des fonctionnalités innovantes")
+            lines.append("• Développer les outils pour créateurs de contenu")
+            lines.append("• Améliorer la monétisation des Reels")
         elif self.platform == "WhatsApp":
-            print("• Accélérer la monétisation via les API business")
-            print("• Développer les services financiers et de paiement")
-            print("• Améliorer l'intégration avec les autres plateformes Meta")
-        
-        print("• Investir dans l'IA générative pour améliorer l'expérience utilisateur")
-        print("• Développer la réalité augmentée/virtuelle pour le métavers")
-        print("• Renforcer la protection des données et la confidentialité")
-        print("• Explorer de nouveaux marchés émergents")
+            lines.append("• Accélérer la monétisation via les API business")
+            lines.append("• Développer les services financiers et de paiement")
+            lines.append("• Améliorer l'intégration avec les autres plateformes Meta")
+        
+        lines.append("• Investir dans l'IA générative pour améliorer l'expérience utilisateur")
+        lines.append("• Développer la réalité augmentée/virtuelle pour le métavers")
+        lines.append("• Renforcer la protection des données et la confidentialité")
+        lines.append("• Explorer de nouveaux marchés émergents")
+        
+        # 8. Indicateurs personnalisés (les équivalents annuels des sections 3 et 4 exceptés)
+        shown = {'Part_Publicite', 'Part_R_D', 'Part_Infrastructure', 'Ratio_LTV_CAC'}
+        kpis = [name for name in self._kpi_definitions() if name in df and name not in shown]
+        if kpis:
+            lines.append("\n8. 🧮 INDICATEURS PERSONNALISÉS (moyenne / dernière année):")
+            for name in kpis:
+                lines.append(f"{name}: {df[name].mean():.2f} / {df[name].iloc[-1]:.2f}")
+        
+        return lines
+
+class MetaFinanceDashboard:
+    """Tableau de bord Jupyter : recalcul incrémental des métriques et des graphiques concernés"""
+    
+    # Graphiques du tableau de bord et colonnes dont ils dépendent
+    PLOTS = [
+        ('_plot_revenue_expenses', ['Revenus_Totaux', 'Depenses_Totales']),
+        ('_plot_revenue_structure', ['Revenus_Publicite', 'Revenus_Autres']),
+        ('_plot_expenses_structure', ['Infrastructure', 'R_D', 'Marketing', 'Personnel']),
+        ('_plot_investments', ['Investissement_IA', 'Investissement_VR', 'Investissement_Securite', 
+                               'Investissement_Croissance', 'Investissement_Contenu']),
+        ('_plot_users_engagement', ['Utilisateurs_Actifs', 'Utilisateurs_Quotidiens']),
+        ('_plot_performance_indicators', ['Cout_Acquisition_Utilisateur', 'Vie_Utilisateur']),
+        ('_plot_profitability', ['Profit_Net', 'Marge_Profit']),
+        ('_plot_sectorial_investments', ['Investissement_IA', 'Investissement_VR', 'Investissement_Securite', 
+                                         'Investissement_Croissance', 'Investissement_Contenu']),
+    ]
+    
+    def __init__(self, platform="Facebook", seed=42, kpis=None, debounce=0.3, display_dpi=80):
+        import ipywidgets as widgets
+        
+        self.analyzer = MetaFinanceAnalyzer(platform, kpis=kpis)
+        self.debounce = debounce
+        self.display_dpi = display_dpi
+        # Les courbes sont réduites à la largeur réellement affichée
+        self.analyzer.dpi = display_dpi
+        
+        # Colonnes brutes (avant événements) des hypothèses courantes, indexées par ces hypothèses
+        self._cache = {}
+        self._df = None
+        self._scope = None
+        self._pending = None
+        
+        # Contrôles
+        self.platform = widgets.Dropdown(options=["Facebook", "WhatsApp", "Instagram"], 
+                                         value=platform, description='Plateforme')
+        self.years = widgets.IntRangeSlider(value=(self.analyzer.start_year, self.analyzer.end_year), 
+                                            min=2000, max=2040, description='Période')
+        # Les générateurs numpy n'acceptent que des graines positives
+        self.seed = widgets.BoundedIntText(value=seed, min=0, max=2**32 - 1, description='Graine')
+        self.growth = {group: widgets.FloatSlider(value=factor, min=0.0, max=3.0, step=0.05, 
+                                                  description=f'Croiss. {group}')
+                       for group, factor in self.analyzer.growth_factors.items()}
+        self.events = {event: widgets.Checkbox(value=enabled, description=event)
+                       for event, enabled in self.analyzer.events.items()}
+        
+        controls = [self.platform, self.years, self.seed, *self.growth.values(), *self.events.values()]
+        for control in controls:
+            control.observe(self._on_change, names='value')
+        
+        # Une figure indépendante de pyplot par graphique : seuls les graphiques modifiés sont re-rendus
+        with _STYLE_LOCK, plt.style.context('seaborn-v0_8'):
+            self.figures = [Figure(figsize=(10, 6)) for _ in self.PLOTS]
+            self.axes = [fig.add_subplot(1, 1, 1) for fig in self.figures]
+        for fig in self.figures:
+            FigureCanvasAgg(fig)
+        self._twins = [[] for _ in self.PLOTS]
+        
+        self.title = widgets.HTML()
+        self.images = [widgets.Image(format='png') for _ in self.PLOTS]
+        self.insights = widgets.Output()
+        charts = widgets.GridBox(self.images, layout=widgets.Layout(grid_template_columns='repeat(2, 1fr)'))
+        self.widget = widgets.HBox([widgets.VBox(controls), 
+                                    widgets.VBox([self.title, charts, self.insights])])
+        
+        self.update()
+    
+    def _ipython_display_(self):
+        from IPython.display import display
+        display(self.widget)
+    
+    def _on_change(self, change):
+        """Regroupe les changements rapprochés (curseurs) en une seule mise à jour"""
+        if self._pending is not None:
+            self._pending.cancel()
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self.update()
+            return
+        self._pending = loop.call_later(self.debounce, self.update)
+    
+    def _compute(self):
+        """Recalcule uniquement les colonnes dont les hypothèses ont changé"""
+        analyzer = self.analyzer
+        dates = analyzer._get_dates()
+        
+        data = {'Annee': [date.year for date in dates]}
+        cache = {}
+        for column, (_, group) in analyzer._column_simulators().items():
+            key = (column, analyzer.platform, analyzer.start_year, analyzer.end_year, 
+                   analyzer.seed, analyzer.growth_factors.get(group))
+            if key in self._cache:
+                cache[key] = self._cache[key]
+            else:
+                cache[key] = np.asarray(analyzer._simulate_column(column, dates), dtype=float)
+            data[column] = cache[key]
+        
+        # Seules les colonnes des hypothèses courantes sont conservées : une entrée par colonne au plus
+        self._cache = cache
+        
+        # Les événements sont appliqués sur une copie, les colonnes en cache restent brutes
+        df = pd.DataFrame(data)
+        analyzer._add_platform_trends(df)
+        analyzer._add_kpis(df)
+        return df
+    
+    def update(self):
+        """Applique les contrôles, recalcule et redessine les seuls graphiques affectés"""
+        self._pending = None
+        analyzer = self.analyzer
+        
+        if self.platform.value != analyzer.platform:
+            analyzer.platform = self.platform.value
+            # Les indicateurs ajoutés via la configuration suivent le changement de plateforme
+            kpis = analyzer.config.get("kpis")
+            analyzer.config = analyzer._get_platform_config()
+            if kpis is not None:
+                analyzer.config["kpis"] = kpis
+        analyzer.start_year, analyzer.end_year = self.years.value
+        analyzer.seed = self.seed.value
+        analyzer.growth_factors.update({group: w.value for group, w in self.growth.items()})
+        analyzer.events.update({event: w.value for event, w in self.events.items()})
+        
+        df = self._compute()
+        
+        # Plateforme ou période modifiée : titres et axes changent partout
+        scope = (analyzer.platform, analyzer.start_year, analyzer.end_year)
+        full = self._df is None or scope != self._scope
+        
+        for index, (method, columns) in enumerate(self.PLOTS):
+            if full or any(not np.array_equal(df[c].values, self._df[c].values) for c in columns):
+                self._redraw(index, method, df)
+        
+        self.title.value = (f'<h2>Analyse Financière de {analyzer.platform} - Meta '
+                            f'({analyzer.start_year}-{analyzer.end_year})</h2>')
+        self._df = df
+        self._scope = scope
+        
+        self.insights.clear_output(wait=True)
+        with self.insights:
+            analyzer._generate_financial_insights(df)
+    
+    def _redraw(self, index, method, df):
+        """Vide, redessine et re-rend un seul graphique (axes jumeaux compris)"""
+        fig = self.figures[index]
+        ax = self.axes[index]
+        
+        with _STYLE_LOCK, plt.style.context('seaborn-v0_8'):
+            for twin in self._twins[index]:
+                twin.remove()
+            ax.cla()
+            
+            before = set(fig.axes)
+            getattr(self.analyzer, method)(df, ax)
+            self._twins[index] = [a for a in fig.axes if a not in before]
+            fig.tight_layout()
+        
+        buffer = io.BytesIO()
+        fig.savefig(buffer, format='png', dpi=self.display_dpi)
+        self.images[index].value = buffer.getvalue()
+
+class MetaFinanceReport:
+    """Rapport consolidé multi-plateformes (PDF ou HTML autonome), une page par plateforme
+    
+    Les données et la table comparative sont calculées une fois dans le processus parent ; 
+    les pages sont construites en parallèle dans des processus (workers) puis écrites dans l'ordre.
+    """
+    
+    def __init__(self, platforms, seed=None, kpis=None, workers=None, dpi=100):
+        self.platforms = list(platforms)
+        
+        # Une graine enfant par plateforme : sinon toutes partageraient les mêmes tirages par colonne
+        if seed is None:
+            seeds = [None] * len(self.platforms)
+        else:
+            seeds = [int(child.generate_state(1)[0]) 
+                     for child in np.random.SeedSequence(seed).spawn(len(self.platforms))]
+        self.analyzers = {platform: MetaFinanceAnalyzer(platform, platform_seed, kpis) 
+                          for platform, platform_seed in zip(self.platforms, seeds)}
+        self.workers = workers  # Nombre de processus de rendu (None : nombre de cœurs)
+        
+        # Résolution des graphiques du rapport, aussi utilisée pour réduire les courbes
+        self.dpi = dpi
+        for analyzer in self.analyzers.values():
+            analyzer.dpi = dpi
+        
+        # Données et agrégats partagés par toutes les pages
+        self.data = None
+        self.comparison = None
+    
+    def prepare(self):
+        """Génère les données de chaque plateforme et la table comparative une seule fois"""
+        if self.data is not None:
+            return
+        
+        self.data = {platform: analyzer.generate_financial_data() 
+                     for platform, analyzer in self.analyzers.items()}
+        
+        # Agrégats calculés en une passe sur toutes les plateformes
+        combined = pd.concat(self.data, names=['Plateforme', None])
+        grouped = combined.groupby(level='Plateforme', sort=False)
+        means, first, last = grouped.mean(), grouped.first(), grouped.last()
+        
+        comparison = pd.DataFrame({
+            'Revenus moyens (M$)': means['Revenus_Totaux'],
+            'Dépenses moyennes (M$)': means['Depenses_Totales'],
+            'Profit net moyen (M$)': means['Profit_Net'],
+            'Marge de profit moyenne (%)': means['Marge_Profit'] * 100,
+            'Utilisateurs actifs moyens (M)': means['Utilisateurs_Actifs'] / 1000000,
+            'Croissance des revenus (%)': (last['Revenus_Totaux'] / first['Revenus_Totaux'] - 1) * 100,
+        })
+        kpis = dict.fromkeys(name for analyzer in self.analyzers.values() 
+                             for name in analyzer._kpi_definitions())
+        for name in kpis:
+            if name in means:
+                comparison[name] = means[name]
+        
+        # Indicateurs en lignes, plateformes en colonnes
+        self.comparison = comparison.T.round(2)
+    
+    def build(self, output_file):
+        """Écrit le rapport ; le format (PDF ou HTML) est déduit de l'extension"""
+        self.prepare()
+        if output_file.lower().endswith('.pdf'):
+            self._build_pdf(output_file)
+        elif output_file.lower().endswith(('.html', '.htm')):
+            self._build_html(output_file)
+        else:
+            raise ValueError(f"Format de rapport non supporté: {output_file} (attendu: .pdf ou .html)")
+        return output_file
+    
+    def _build_pdf(self, output_file):
+        """Figures construites par les processus de rendu, écrites dans l'ordre par le parent"""
+        # Le style et le GIL empêchent tout gain avec des threads : une Figure se sérialise entre processus
+        with ProcessPoolExecutor(self.workers) as executor, PdfPages(output_file) as pdf:
+            for fig in executor.map(self._render_pdf_page, self.platforms):
+                pdf.savefig(fig)
+    
+    def _render_pdf_page(self, platform):
+        """Page complète d'une plateforme (exécuté dans un processus de rendu)"""
+        analyzer = self.analyzers[platform]
+        df = self.data[platform]
+        
+        # Graphiques en haut de page, insights et comparaison en dessous
+        fig = Figure(figsize=(20, 34))
+        FigureCanvasAgg(fig)
+        analyzer.render_financial_analysis(df, fig, rect=(0, 10 / 34, 1, 1))
+        
+        with _STYLE_LOCK, plt.style.context('seaborn-v0_8'):
+            # Les polices PDF ne contiennent pas les emojis des insights
+            insights = "\n".join(analyzer._financial_insights(df))
+            insights = ''.join(char for char in insights if ord(char) <= 0xFFFF)
+            fig.text(0.02, 9.6 / 34, insights, va='top', ha='left', family='monospace', fontsize=9)
+            
+            ax = fig.add_axes([0.55, 0.02, 0.42, 0.24])
+            ax.axis('off')
+            ax.set_title(f'Comparaison inter-plateformes ({analyzer.start_year}-{analyzer.end_year})', 
+                         fontsize=12, fontweight='bold')
+            cells = [[f'{value:,.2f}' for value in row] for row in self.comparison.values]
+            table = ax.table(cellText=cells, 
+                             rowLabels=self.comparison.index, colLabels=self.comparison.columns, 
+                             loc='center')
+            table.auto_set_font_size(False)
+            table.set_fontsize(10)
+            table.scale(1, 1.6)
+        
+        return fig
+    
+    def _build_html(self, output_file):
+        """Images rendues par les processus de rendu, pages écrites dans l'ordre dans un fichier autonome"""
+        comparison = self.comparison.to_html(float_format='{:,.2f}'.format)
+        
+        with ProcessPoolExecutor(self.workers) as executor, open(output_file, 'w', encoding='utf-8') as f:
+            f.write('<!DOCTYPE html>\n<html lang="fr">\n<head>\n<meta charset="utf-8">\n'
+                    '<title>Analyse Financière des Plateformes Meta</title>\n'
+                    '<style>body{font-family:sans-serif;margin:2em} img{max-width:100%} '
+                    'section{page-break-after:always} table{border-collapse:collapse} '
+                    'td,th{padding:4px 8px;text-align:right}</style>\n</head>\n<body>\n')
+            images = executor.map(self._render_html_image, self.platforms)
+            for platform, image in zip(self.platforms, images):
+                f.write(self._html_page(platform, image, comparison))
+            f.write('</body>\n</html>\n')
+    
+    def _render_html_image(self, platform):
+        """Graphiques d'une plateforme en PNG (exécuté dans un processus de rendu)"""
+        fig = self.analyzers[platform].render_financial_analysis(self.data[platform])
+        buffer = io.BytesIO()
+        fig.savefig(buffer, format='png', dpi=self.dpi, bbox_inches='tight')
+        return buffer.getvalue()
+    
+    def _html_page(self, platform, png, comparison):
+        analyzer = self.analyzers[platform]
+        image = base64.b64encode(png).decode('ascii')
+        insights = html.escape("\n".join(analyzer._financial_insights(self.data[platform])))
+        
+        return (f'<section>\n<h1>{html.escape(platform)}</h1>\n'
+                f'<img alt="Analyse financière de {html.escape(platform)}" src="data:image/png;base64,{image}">\n'
+                f'<pre>{insights}</pre>\n'
+                f'<h2>Comparaison inter-plateformes ({analyzer.start_year}-{analyzer.end_year})</h2>\n'
+                f'{comparison}\n</section>\n')
 
 def main():
     """Fonction principale pour Meta"""
@@ -749,15 +1333,24 @@ def main():
     print("Plateformes disponibles:")
     for i, platform in enumerate(platforms, 1):
         print(f"{i}. {platform}")
+    print(f"{len(platforms) + 1}. Rapport consolidé (toutes les plateformes)")
     
     try:
         choix = int(input("\nChoisissez le numéro de la plateforme à analyser: "))
-        if choix < 1 or choix > len(platforms):
+        if choix < 1 or choix > len(platforms) + 1:
             raise ValueError
-        platform_selectionnee = platforms[choix-1]
     except (ValueError, IndexError):
         print("Choix invalide. Sélection de Facebook par défaut.")
-        platform_selectionnee = "Facebook"
+        choix = 1
+    
+    # Rapport consolidé : une page par plateforme dans un seul PDF
+    if choix == len(platforms) + 1:
+        print("\n📑 Création du rapport consolidé...")
+        output_file = MetaFinanceReport(platforms).build('Meta_financial_report_2010_2025.pdf')
+        print(f"\n✅ Rapport consolidé sauvegardé: {output_file}")
+        return
+    
+    platform_selectionnee = platforms[choix-1]
     
     # Initialiser l'analyseur
     analyzer = MetaFinanceAnalyzer(platform_selectionnee)